@@ -3,10 +3,15 @@
  * Handles real-time communication between the UXP plugin and MCP server
  */
 
+import { encode, decode } from '@msgpack/msgpack';
 import { executeAction } from './tools';
 
+// Subprotocols offered to the server, in order of preference
+const MSGPACK_SUBPROTOCOL = 'mcp-adobe.msgpack';
+const JSON_SUBPROTOCOL = 'mcp-adobe.json';
+
 export interface WebSocketMessage {
-  id: string;
+  id: string; // Opaque correlation id (a numeric string such as "42"), echoed back in the response
   action: string;
   data?: any;
 }
@@ -40,19 +45,27 @@ export class WebSocketClient {
       this.updateStatus('Connecting...', false);
       
       // @ts-ignore: UXP WebSocket API
-      this.socket = new WebSocket(this.url);
+      this.socket = new WebSocket(this.url, [MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL]);
+      this.socket.binaryType = 'arraybuffer';
       console.log(`WebSocket connecting to ${this.url}`);
 
       this.socket.onopen = () => {
         this.updateStatus('Connected', true);
-        console.log('WebSocket connected');
+        console.log(`WebSocket connected (protocol: ${this.socket?.protocol || 'json'})`);
       };
 
       this.socket.onmessage = (event) => {
         console.log('Message received:', event.data);
         try {
-          const message = JSON.parse(event.data) as WebSocketMessage;
-          this.handleMessage(message);
+          // The server may coalesce several instructions into one frame as an array
+          // Binary frames carry msgpack, text frames carry JSON
+          const parsed = (event.data instanceof ArrayBuffer
+            ? decode(new Uint8Array(event.data))
+            : JSON.parse(event.data)) as WebSocketMessage | WebSocketMessage[];
+          const messages = Array.isArray(parsed) ? parsed : [parsed];
+          for (const message of messages) {
+            this.handleMessage(message);
+          }
         } catch (error) {
           console.error('Error parsing message:', error);
         }
@@ -108,7 +121,11 @@ export class WebSocketClient {
     };
     
     try {
-      this.socket.send(JSON.stringify(fullResponse));
+      if (this.socket.protocol === MSGPACK_SUBPROTOCOL) {
+        this.socket.send(encode(fullResponse));
+      } else {
+        this.socket.send(JSON.stringify(fullResponse));
+      }
     } catch (error) {
       console.error('Error sending response:', error);
     }
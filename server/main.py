@@ -8,12 +8,12 @@ from typing import Dict, Any, Optional, AsyncIterator
 from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP
-from websocket_server import get_server, WebSocketServer
+from websocket_server import get_server, ws_server_var, LOG_LEVEL, WebSocketServer
 from tools import register_premiere_tools
 
-# Configure logging
+# Configure logging (set MCP_ADOBE_LOG_LEVEL=WARNING to keep per-message logs off the hot path)
 logging.basicConfig(
-    level=logging.INFO,
+    level=LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -26,9 +26,11 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     """Handle server startup and shutdown."""
     global ws_server
     logger.info("Adobe Premiere Pro MCP Server starting up")
+    token = None
     try:
         # Initialize WebSocket server
         ws_server = get_server(host="localhost", port=8765)
+        token = ws_server_var.set(ws_server)
         await ws_server.start()
         logger.info("WebSocket server started")
         yield {"ws_server": ws_server}
@@ -36,6 +38,8 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
         if ws_server:
             await ws_server.stop()
             ws_server = None
+        if token is not None:
+            ws_server_var.reset(token)
         logger.info("Adobe Premiere Pro MCP Server shut down")
 
 # Initialize MCP server
@@ -50,4 +54,10 @@ register_premiere_tools(mcp)
 
 # Run the server
 if __name__ == "__main__":
+    # Use uvloop's faster event loop where available (not supported on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.info("uvloop not available, using default asyncio event loop")
     mcp.run(transport='stdio')
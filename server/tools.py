@@ -4,172 +4,182 @@ Adobe Premiere Pro MCP Server tools for project, sequence, and media management
 
 import logging
 import functools
-from typing import Dict, Any, Callable, Optional, TypeVar, Awaitable, Tuple
+from typing import Dict, Any, Callable, Optional, TypeVar, Awaitable
 
-from websocket_server import get_server
+from websocket_server import ws_server_var
 
 logger = logging.getLogger(__name__)
 
 # Type hint definitions
 T = TypeVar('T')
-ActionFunction = Callable[..., Awaitable[Tuple[str, Dict[str, Any]]]]
+DataBuilder = Callable[..., Dict[str, Any]]
+ActionFunction = Callable[..., Awaitable[Dict[str, Any]]]
 
 # Action processing decorator
-def premiere_action(func: ActionFunction) -> Callable[..., Awaitable[Dict[str, Any]]]:
+def premiere_action(action_name: str) -> Callable[[DataBuilder], ActionFunction]:
     """
-    Decorator: Handles common processing for Premiere Pro actions
+    Decorator factory: Handles common processing for Premiere Pro actions
     - Error handling
     - Communication with WebSocket server
     - Response standardization
+    
+    The decorated function only builds the action data; the plugin action name
+    is fixed here so each wrapper carries it in its closure.
+    
+    Args:
+        action_name: Action name on the plugin side
     """
-    @functools.wraps(func)
-    async def wrapper(*args, **kwargs) -> Dict[str, Any]:
-        ws_server = get_server()
-        if not ws_server:
-            return {"success": False, "message": "WebSocket server not initialized"}
+    def decorator(build: DataBuilder) -> ActionFunction:
+        func_name = build.__name__
         
-        try:
-            # Execute the original function to get action name and data
-            action_name, action_data = await func(*args, **kwargs)
+        @functools.wraps(build)
+        async def wrapper(**kwargs) -> Dict[str, Any]:
+            ws_server = ws_server_var.get(None)
+            if not ws_server:
+                return {"success": False, "message": "WebSocket server not initialized"}
             
-            # Send to plugin
             try:
-                response = await ws_server.send_instruction(
-                    action=action_name, 
-                    data=action_data
-                )
-            except TimeoutError:
-                return {"success": False, "message": "Timeout waiting for response from plugin"}
-            
-            # Process response
-            if not response:
-                return {"success": False, "message": "No response from plugin"}
-            
-            logger.info(f"Received response: {response}")
-            if "success" in response and response["success"]:
-                return {
-                    "success": True,
-                    "response": response.get("result", {})
-                }
-            else:
-                return {"success": False, "message": response.get("error", "Unknown error")}
+                # Send to plugin
+                try:
+                    response = await ws_server.send_instruction(
+                        action=action_name, 
+                        data=build(**kwargs)
+                    )
+                except TimeoutError:
+                    return {"success": False, "message": "Timeout waiting for response from plugin"}
+                
+                # Process response
+                if not response:
+                    return {"success": False, "message": "No response from plugin"}
                 
-        except Exception as e:
-            logger.exception(f"Error in {func.__name__}:")
-            return {"success": False, "message": f"Error in {func.__name__}: {str(e)}"}
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Received response: %s", response)
+                if response.get("success"):
+                    return {
+                        "success": True,
+                        "response": response.get("result", {})
+                    }
+                else:
+                    return {"success": False, "message": response.get("error", "Unknown error")}
+                    
+            except Exception as e:
+                logger.exception("Error in %s:", func_name)
+                return {"success": False, "message": f"Error in {func_name}: {str(e)}"}
+        
+        return wrapper
     
-    return wrapper
+    return decorator
 
 # Project management action definitions
 class PremiereProjectActions:
     """Implementation of Premiere Pro project-related actions"""
     
     @staticmethod
-    @premiere_action
-    async def get_active(**_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("getActiveProject")
+    def get_active(**_) -> Dict[str, Any]:
         """Get active project (extra arguments are ignored)"""
-        return "getActiveProject", {}
+        return {}
     
     @staticmethod
-    @premiere_action
-    async def open_project(path: str, **options) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("openProject")
+    def open_project(path: str, **options) -> Dict[str, Any]:
         """Open a project"""
-        return "openProject", {"path": path, "options": options}
+        return {"path": path, "options": options}
     
     @staticmethod
-    @premiere_action
-    async def create_project(path: str, **_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("createProject")
+    def create_project(path: str, **_) -> Dict[str, Any]:
         """Create a new project"""
-        return "createProject", {"path": path}
+        return {"path": path}
     
     @staticmethod
-    @premiere_action
-    async def save_project(**_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("saveProject")
+    def save_project(**_) -> Dict[str, Any]:
         """Save the project"""
-        return "saveProject", {}
+        return {}
     
     @staticmethod
-    @premiere_action
-    async def save_project_as(path: str, **_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("saveProjectAs")
+    def save_project_as(path: str, **_) -> Dict[str, Any]:
         """Save the project with a new name"""
-        return "saveProjectAs", {"path": path}
+        return {"path": path}
     
     @staticmethod
-    @premiere_action
-    async def close_project(**options) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("closeProject")
+    def close_project(**options) -> Dict[str, Any]:
         """Close the project"""
-        return "closeProject", {"options": options}
+        return {"options": options}
 
 # Sequence management action definitions
 class PremiereSequenceActions:
     """Implementation of Premiere Pro sequence-related actions"""
     
     @staticmethod
-    @premiere_action
-    async def get_active(**_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("getActiveSequence")
+    def get_active(**_) -> Dict[str, Any]:
         """Get active sequence"""
-        return "getActiveSequence", {}
+        return {}
     
     @staticmethod
-    @premiere_action
-    async def create_sequence(name: str, preset_path: Optional[str] = None, **_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("createSequence")
+    def create_sequence(name: str, preset_path: Optional[str] = None, **_) -> Dict[str, Any]:
         """Create a new sequence"""
-        return "createSequence", {"name": name, "presetPath": preset_path}
+        return {"name": name, "presetPath": preset_path}
     
     @staticmethod
-    @premiere_action
-    async def create_sequence_from_media(
+    @premiere_action("createSequenceFromMedia")
+    def create_sequence_from_media(
         name: str, 
         clip_project_items: list, 
         target_bin: Optional[str] = None,
         **_
-    ) -> Tuple[str, Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """Create a new sequence from media"""
-        return "createSequenceFromMedia", {
+        return {
             "name": name, 
             "clipProjectItems": clip_project_items,
             "targetBin": target_bin
         }
     
     @staticmethod
-    @premiere_action
-    async def set_active_sequence(sequence_id: str, **_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("setActiveSequence")
+    def set_active_sequence(sequence_id: str, **_) -> Dict[str, Any]:
         """Set active sequence"""
-        return "setActiveSequence", {"sequenceId": sequence_id}
+        return {"sequenceId": sequence_id}
     
     @staticmethod
-    @premiere_action
-    async def get_sequence_list(**_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("getSequenceList")
+    def get_sequence_list(**_) -> Dict[str, Any]:
         """Get list of all sequences in the project"""
-        return "getSequenceList", {}
+        return {}
     
     @staticmethod
-    @premiere_action
-    async def get_player_position(**_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("getPlayerPosition")
+    def get_player_position(**_) -> Dict[str, Any]:
         """Get playhead position"""
-        return "getPlayerPosition", {}
+        return {}
     
     @staticmethod
-    @premiere_action
-    async def set_player_position(position, **_) -> Tuple[str, Dict[str, Any]]:
+    @premiere_action("setPlayerPosition")
+    def set_player_position(position, **_) -> Dict[str, Any]:
         """Set playhead position"""
-        return "setPlayerPosition", {"position": position}
+        return {"position": position}
 
 # Media import action definitions
 class PremiereMediaActions:
     """Implementation of Premiere Pro media-related actions"""
     
     @staticmethod
-    @premiere_action
-    async def import_files(
+    @premiere_action("importFiles")
+    def import_files(
         file_paths: list, 
         suppress_ui: bool = False, 
         target_bin: Optional[str] = None,
         as_numbered_stills: bool = False,
         **_
-    ) -> Tuple[str, Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """Import files"""
-        return "importFiles", {
+        return {
             "filePaths": file_paths,
             "suppressUI": suppress_ui,
             "targetBin": target_bin,
@@ -177,46 +187,54 @@ class PremiereMediaActions:
         }
     
     @staticmethod
-    @premiere_action
-    async def import_sequences(
+    @premiere_action("importSequences")
+    def import_sequences(
         project_path: str, 
         sequence_ids: list,
         **_
-    ) -> Tuple[str, Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """Import sequences from another project"""
-        return "importSequences", {
+        return {
             "projectPath": project_path,
             "sequenceIds": sequence_ids
         }
     
     @staticmethod
-    @premiere_action
-    async def import_ae_comps(
+    @premiere_action("importAEComps")
+    def import_ae_comps(
         aep_path: str, 
         comp_names: list, 
         target_bin: Optional[str] = None,
         **_
-    ) -> Tuple[str, Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """Import After Effects compositions"""
-        return "importAEComps", {
+        return {
             "aepPath": aep_path,
             "compNames": comp_names,
             "targetBin": target_bin
         }
     
     @staticmethod
-    @premiere_action
-    async def import_all_ae_comps(
+    @premiere_action("importAllAEComps")
+    def import_all_ae_comps(
         aep_path: str, 
         target_bin: Optional[str] = None,
         **_
-    ) -> Tuple[str, Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """Import all After Effects compositions"""
-        return "importAllAEComps", {
+        return {
             "aepPath": aep_path,
             "targetBin": target_bin
         }
 
+def _action_table(actions_class: type) -> Dict[str, Callable[..., Awaitable[Dict[str, Any]]]]:
+    """Build a name → action lookup table from the public methods of an actions class"""
+    return {
+        name: getattr(actions_class, name)
+        for name in dir(actions_class)
+        if not name.startswith('_')
+    }
+
 # Registration with MCP Server
 def register_premiere_tools(server: Any) -> None:
     """
@@ -227,6 +245,11 @@ def register_premiere_tools(server: Any) -> None:
     """
     logger.info("Registering Premiere Pro tools")
     
+    # Action dispatch tables, built once at registration
+    project_actions = _action_table(PremiereProjectActions)
+    sequence_actions = _action_table(PremiereSequenceActions)
+    media_actions = _action_table(PremiereMediaActions)
+    
     # Project management tool
     @server.tool()
     async def manage_project(action: str = "get_active", **kwargs) -> Dict[str, Any]:
@@ -246,11 +269,8 @@ def register_premiere_tools(server: Any) -> None:
         Returns:
             Dict[str, Any]: Operation result
         """
-        # Convert action name to method name (get_active → get_active)
-        method_name = action.lower()
-        
-        # Action dispatch
-        action_method = getattr(PremiereProjectActions, method_name, None)
+        # Action dispatch, falling back to the lowercased name (GET_ACTIVE → get_active)
+        action_method = project_actions.get(action) or project_actions.get(action.lower())
         if not action_method:
             return {"success": False, "message": f"Unknown project action: {action}"}
             
@@ -276,15 +296,13 @@ def register_premiere_tools(server: Any) -> None:
         Returns:
             Dict[str, Any]: Operation result
         """
-        # Convert action name to method name (get_active → get_active)
-        method_name = action.lower()
-        
-        # Action dispatch
-        action_method = getattr(PremiereSequenceActions, method_name, None)
+        # Action dispatch, falling back to the lowercased name (GET_ACTIVE → get_active)
+        action_method = sequence_actions.get(action) or sequence_actions.get(action.lower())
         if not action_method:
             return {"success": False, "message": f"Unknown sequence action: {action}"}
             
-        logger.info(f"Executing sequence action: {action} with params: {kwargs['kwargs']}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing sequence action: %s with params: %s", action, kwargs["kwargs"])
         return await action_method(**kwargs["kwargs"])
     
     # Media management tool
@@ -304,11 +322,8 @@ def register_premiere_tools(server: Any) -> None:
         Returns:
             Dict[str, Any]: Operation result
         """
-        # Convert action name to method name (import_files → import_files)
-        method_name = action.lower()
-        
-        # Action dispatch
-        action_method = getattr(PremiereMediaActions, method_name, None)
+        # Action dispatch, falling back to the lowercased name (IMPORT_FILES → import_files)
+        action_method = media_actions.get(action) or media_actions.get(action.lower())
         if not action_method:
             return {"success": False, "message": f"Unknown media action: {action}"}
             
@@ -4,49 +4,126 @@ Handles real-time communication between the Python server and UXP plugin
 """
 
 import asyncio
-import json
+import contextvars
+import functools
 import logging
+import os
+import socket
 import time
-import uuid
+import msgpack
+import orjson
 import websockets
-from typing import Dict, Any, Callable, Optional, List
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import Frame, OP_BINARY, OP_TEXT
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple, Union
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+def _log_level_from_env() -> int:
+    """Read the log level from MCP_ADOBE_LOG_LEVEL, falling back to INFO on unknown values"""
+    level = logging.getLevelName(os.environ.get("MCP_ADOBE_LOG_LEVEL", "INFO").upper())
+    return level if isinstance(level, int) else logging.INFO
+
+LOG_LEVEL = _log_level_from_env()
+
+logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# WebSocket subprotocols offered to the plugin, in order of preference.
+# Plugins that negotiate none of them fall back to JSON text frames.
+MSGPACK_SUBPROTOCOL = "mcp-adobe.msgpack"
+JSON_SUBPROTOCOL = "mcp-adobe.json"
+
+# Messages smaller than this are sent uncompressed; most instructions are tiny
+# control messages, only bulk payloads (e.g. file lists) benefit from deflate
+COMPRESSION_THRESHOLD = 1024
+
+# Seconds to wait for a plugin response, and how often expired requests are swept
+RESPONSE_TIMEOUT = 10
+REAP_INTERVAL = 0.1
+
+# Shared payload for instructions without data; only ever serialized, never mutated
+_EMPTY_DATA: Dict[str, Any] = {}
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that leaves small messages uncompressed"""
+
+    def encode(self, frame: Frame) -> Frame:
+        # An unset rsv1 bit marks the message as uncompressed, and skipped
+        # messages never reach the encoder, so both sides stay in sync
+        if frame.opcode in (OP_TEXT, OP_BINARY) and frame.fin and len(frame.data) < COMPRESSION_THRESHOLD:
+            return frame
+        return super().encode(frame)
+
+class ThresholdPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negotiates permessage-deflate using ThresholdPerMessageDeflate"""
+
+    def process_request_params(self, params, accepted_extensions):
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        return response_params, ThresholdPerMessageDeflate(
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings,
+        )
+
 class WebSocketServer:
     def __init__(self, host: str = "localhost", port: int = 8765):
         self.host = host
         self.port = port
-        self.clients: List[websockets.WebSocketServerProtocol] = []
+        self.clients: Set[websockets.WebSocketServerProtocol] = set()
+        self._latest_client: Optional[websockets.WebSocketServerProtocol] = None
         self.action_handlers: Dict[str, Callable] = {}
         self._server = None
-        self.message_dict: Dict[str, Any] = {}
-        self.response_events: Dict[str, asyncio.Event] = {}
+        # message id -> (future, monotonic deadline)
+        self._pending: Dict[str, Tuple[asyncio.Future, float]] = {}
+        self._next_id = 0
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._reaper_task: Optional[asyncio.Task] = None
 
-    async def _handle_message(self, websocket: websockets.WebSocketServerProtocol, message: str):
+    async def _handle_message(self, websocket: websockets.WebSocketServerProtocol, message: Union[str, bytes]):
         """Handle incoming message from client"""
         try:
-            data = json.loads(message)
-            if not isinstance(data, dict):
-                logger.error(f"Invalid message format: {message}")
-                return
-                
-            logger.info(f"Received message: {data}")
+            # Binary frames carry msgpack, text frames carry JSON
+            if isinstance(message, bytes):
+                data = msgpack.unpackb(message, raw=False)
+            else:
+                data = orjson.loads(message)
             
-            # Handle response from plugin
-            if "id" in data and ("result" in data or "error" in data):
-                logger.info(f"Received response: {data}")
-                # Here you could route responses to waiting handlers
-                self.message_dict[data["id"]] = data
-                self.response_events[data["id"]].set()
-                return
+            # A batched frame carries several messages as an array
+            if isinstance(data, list):
+                for entry in data:
+                    self._resolve(entry)
+            else:
+                self._resolve(data)
 
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON: {message}")
+        except (orjson.JSONDecodeError, ValueError):
+            logger.error("Invalid message payload: %r", message)
         except Exception as e:
             logger.exception("Error handling message:")
     
+    def _resolve(self, data: Any):
+        """Route a single decoded message, completing the matching pending request"""
+        if not isinstance(data, dict):
+            logger.error(f"Invalid message format: {data}")
+            return
+            
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Received message: %s", data)
+        
+        # Handle response from plugin
+        msg_id = data.get("id")
+        if msg_id is not None and ("result" in data or "error" in data):
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Received response: %s", data)
+            pending = self._pending.pop(msg_id, None)
+            if pending is None:
+                logger.warning("No pending request for response id: %s", msg_id)
+                return
+            future, _ = pending
+            if not future.done():
+                future.set_result(data)
+    
     # async def _send_response(self, websocket: websockets.WebSocketServerProtocol, message_id: str, result: Any, success: bool = True):
     #     """Send response to client"""
     #     response = {
@@ -63,11 +140,25 @@ class WebSocketServer:
     #     logger.debug(f"Sent response: {response}")
     
     
+    def _set_nodelay(self, websocket: websockets.WebSocketServerProtocol):
+        """Disable Nagle's algorithm so small replies are not delayed"""
+        # asyncio and uvloop normally do this for TCP transports already;
+        # set it explicitly so it does not depend on the event loop in use
+        sock = websocket.transport.get_extra_info("socket")
+        if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            logger.warning("Could not set TCP_NODELAY on client socket")
+    
     async def _client_handler(self, websocket: websockets.WebSocketServerProtocol, ):
         """Handle new client connection"""
-        self.clients.append(websocket)
+        self._set_nodelay(websocket)
+        self.clients.add(websocket)
+        self._latest_client = websocket
         client_id = str(id(websocket))
-        logger.info(f"Client connected [id: {client_id}] (total: {len(self.clients)})")
+        logger.info("Client connected [id: %s] (protocol: %s, total: %d)", client_id, websocket.subprotocol or "json", len(self.clients))
         
         try:
             async for message in websocket:
@@ -75,19 +166,18 @@ class WebSocketServer:
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Client connection closed [id: {client_id}]")
         finally:
-            self.clients.remove(websocket)
+            self.clients.discard(websocket)
+            if self._latest_client is websocket:
+                # Fall back to any remaining client
+                self._latest_client = next(iter(self.clients), None)
             logger.info(f"Client disconnected [id: {client_id}] (remaining: {len(self.clients)})")
     
-    async def wait_for_response(self, message_id: str) -> Any:
-        """Wait for a response from the plugin"""
-        event = self.response_events[message_id] = asyncio.Event()
-        timeout = 10
-
+    async def wait_for_response(self, message_id: str, future: asyncio.Future) -> Any:
+        """Wait for a response from the plugin (timed out by the reaper task)"""
         try:
-            await asyncio.wait_for(event.wait(), timeout=timeout)
-            return self.message_dict[message_id]
+            return await future
         finally:
-            self.response_events.pop(message_id, None)
+            self._pending.pop(message_id, None)
 
     async def send_instruction(self, action: str = "", data: Any = None) -> str:
         """
@@ -101,55 +191,143 @@ class WebSocketServer:
         Returns:
             str: Message ID
         """
-        if not self.clients:
+        if self._latest_client is None:
             logger.warning("No clients connected, cannot send instruction")
             return ""
-            
-        target_client = self.clients[-1]
         
-        message_id = str(uuid.uuid4())
+        # Only used to correlate replies in-process; the event loop is single-threaded so no lock is needed
+        self._next_id += 1
+        message_id = str(self._next_id)
+        # Register before sending so a fast reply cannot arrive ahead of the waiter
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (future, time.monotonic() + RESPONSE_TIMEOUT)
         message = {
             "id": message_id,
             "action": action,
-            "data": data or {}
+            "data": data or _EMPTY_DATA
         }
         
-        json_message = json.dumps(message)
-        try:
-            await target_client.send(json_message)
-            logger.info(f"Sent instruction: {action} with id: {message_id}")
-        except Exception as e:
-            logger.exception("Error sending instruction:")
-            raise e
+        # Queued for the writer task, which may coalesce it with other pending instructions
+        await self._outbox.put(message)
+        logger.info("Queued instruction: %s with id: %s", action, message_id)
     
         try:
-            response = await self.wait_for_response(message_id)
+            response = await self.wait_for_response(message_id, future)
             return response
         except Exception as e:
             logger.exception("Error waiting for response:")
             raise e
         
+    def _fail(self, message_ids: List[str], error: Exception):
+        """Fail the pending requests for the given message ids right away"""
+        for message_id in message_ids:
+            pending = self._pending.pop(message_id, None)
+            if pending is not None and not pending[0].done():
+                pending[0].set_exception(error)
+    
+    async def _drain(self):
+        """Send queued instructions, packing everything pending into a single frame"""
+        while True:
+            batch = [await self._outbox.get()]
+            while not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            
+            target_client = self._latest_client
+            if target_client is None:
+                logger.warning("No clients connected, dropping %d instruction(s)", len(batch))
+                self._fail([message["id"] for message in batch], ConnectionError("No clients connected"))
+                continue
+            
+            # Encode each instruction on its own so one unserializable payload
+            # only fails its own request, not the rest of the batch
+            use_msgpack = target_client.subprotocol == MSGPACK_SUBPROTOCOL
+            sent_ids: List[str] = []
+            parts: List[bytes] = []
+            for message in batch:
+                try:
+                    if use_msgpack:
+                        parts.append(msgpack.packb(message, use_bin_type=True))
+                    else:
+                        parts.append(orjson.dumps(message))
+                except Exception as e:
+                    logger.exception("Error encoding instruction %s:", message["id"])
+                    self._fail([message["id"]], e)
+                    continue
+                sent_ids.append(message["id"])
+            
+            if not parts:
+                continue
+            
+            # A lone instruction is sent as a plain object, several as an array
+            if use_msgpack:
+                frame = parts[0] if len(parts) == 1 else msgpack.Packer().pack_array_header(len(parts)) + b"".join(parts)
+            else:
+                # JSON plugins parse text frames, so decode orjson's bytes output
+                frame = (parts[0] if len(parts) == 1 else b"[" + b",".join(parts) + b"]").decode()
+            try:
+                await target_client.send(frame)
+                logger.info("Sent %d instruction(s) in one frame", len(parts))
+            except Exception as e:
+                logger.exception("Error sending instruction:")
+                self._fail(sent_ids, e)
+        
+    async def _reap(self):
+        """Fail pending requests whose deadline has passed"""
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            now = time.monotonic()
+            expired = [message_id for message_id, (_, deadline) in self._pending.items() if deadline <= now]
+            for message_id in expired:
+                future, _ = self._pending.pop(message_id)
+                if not future.done():
+                    future.set_exception(TimeoutError(f"No response for message id: {message_id}"))
+        
     async def start(self):
         """Start the WebSocket server"""
         self._server = await websockets.serve(
-            self._client_handler, self.host, self.port
+            self._client_handler, self.host, self.port,
+            subprotocols=[MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL],
+            # Same settings as websockets' default deflate, but size-gated
+            compression=None,
+            extensions=[
+                ThresholdPerMessageDeflateFactory(
+                    server_max_window_bits=12,
+                    client_max_window_bits=12,
+                    compress_settings={"memLevel": 5},
+                )
+            ]
         )
+        self._writer_task = asyncio.create_task(self._drain())
+        self._reaper_task = asyncio.create_task(self._reap())
         logger.info(f"WebSocket server started at ws://{self.host}:{self.port}")
         
     async def stop(self):
         """Stop the WebSocket server"""
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        # Nothing will resolve or time out in-flight requests now, so fail them
+        while not self._outbox.empty():
+            self._outbox.get_nowait()
+        self._fail(list(self._pending), ConnectionError("WebSocket server stopped"))
+        self._pending.clear()
         if self._server:
             self._server.close()
             await self._server.wait_closed()
             self._server = None
             logger.info("WebSocket server stopped")
 
-# Singleton instance
-_server_instance = None
+# Server bound for the lifetime of the MCP server, read by tool actions
+ws_server_var: contextvars.ContextVar[WebSocketServer] = contextvars.ContextVar("ws_server")
+
+@functools.lru_cache(maxsize=None)
+def _make_server(host: str, port: int) -> WebSocketServer:
+    """Create the WebSocket server for an address (cached, one instance per address)"""
+    return WebSocketServer(host, port)
 
 def get_server(host: str = "localhost", port: int = 8765) -> WebSocketServer:
-    """Get the global WebSocket server instance"""
-    global _server_instance
-    if _server_instance is None:
-        _server_instance = WebSocketServer(host, port)
-    return _server_instance 
\ No newline at end of file
+    """Get the shared WebSocket server instance"""
+    return _make_server(host, port) 
\ No newline at end of file